@@ -49,6 +49,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'main.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -65,6 +66,7 @@ CORS_ALLOW_CREDENTIALS = True
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
+        'main.authentication.BatchAuthentication',
         'rest_framework.authentication.TokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
@@ -73,8 +75,27 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
+    'DEFAULT_THROTTLE_CLASSES': [
+        'main.throttling.TokenBucketThrottle',
+    ],
+    # Bucket size per user and scope; the bucket refills at the same rate
+    'DEFAULT_THROTTLE_RATES': {
+        'uploads': '30/hour',
+        'auth': '10/min',
+        'queue': '60/min',
+        'reads': '300/min',
+    },
+    # Throttle by REMOTE_ADDR; raise to the number of trusted proxies in front
+    # of the app so X-Forwarded-For cannot be spoofed to dodge the limits
+    'NUM_PROXIES': 0,
 }
 
+# Throttle buckets live in process memory ('local') or in a Django cache
+# ('cache') shared by all workers
+THROTTLE_BUCKET_STORE = 'local'
+THROTTLE_CACHE_ALIAS = 'default'
+THROTTLE_LOCAL_MAX_KEYS = 100000
+
 # JWT settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
@@ -83,6 +104,55 @@ SIMPLE_JWT = {
     'BLACKLIST_AFTER_ROTATION': True,
 }
 
+# Article archival: finished articles not updated for this long are moved
+# to the archive tables by `manage.py archive_articles`
+ARTICLE_ARCHIVE_AFTER = timedelta(days=180)
+ARTICLE_ARCHIVE_BATCH_SIZE = 500
+
+# Article change feed: events younger than the settle window are held back
+# so that late-committing transactions are never skipped by a cursor
+ARTICLE_CHANGES_SETTLE = timedelta(seconds=1)
+ARTICLE_CHANGES_LIMIT = 500
+
+# Admin changelists use the planner's row estimate instead of COUNT(*) once a
+# table is at least this large (PostgreSQL only)
+ADMIN_ESTIMATED_COUNT_THRESHOLD = 100000
+
+# Signed download URLs: lifetime in seconds, expiry rounding (so repeated
+# requests get the same cacheable URL) and an optional internal location for
+# nginx X-Accel-Redirect, e.g. '/protected-media/'
+SIGNED_DOWNLOAD_TTL = 15 * 60
+SIGNED_DOWNLOAD_BUCKET = 5 * 60
+SIGNED_DOWNLOAD_ACCEL_PREFIX = None
+
+# Maximum number of articles in one ZIP download
+BULK_DOWNLOAD_MAX_ARTICLES = 500
+
+# Batch endpoint: maximum sub-requests per batch and threads used to run
+# consecutive reads concurrently (1 runs everything in order on one thread)
+BATCH_MAX_REQUESTS = 20
+BATCH_MAX_WORKERS = 4
+
+# Response compression: responses smaller than this are sent as they are.
+# zstd and brotli are used when the zstandard/brotli packages are installed
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_CONTENT_TYPES = (
+    'text/',
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'application/x-tex',
+    'image/svg+xml',
+)
+
+# Uploads with these extensions are gzipped at rest when the default storage
+# is 'main.storage.CompressedFileSystemStorage', e.g.
+# STORAGES = {
+#     'default': {'BACKEND': 'main.storage.CompressedFileSystemStorage'},
+#     'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+# }
+COMPRESSED_STORAGE_EXTENSIONS = ('.txt', '.tex', '.md', '.rtf', '.csv', '.xml', '.html', '.pdf')
+
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
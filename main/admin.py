@@ -1,6 +1,52 @@
+from django.conf import settings
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User, Editor, Article, ArticleAssignment, Feedback, Statistics
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from .models import (
+    User, Editor, Article, ArticleAssignment, Feedback, Statistics,
+    ArchivedArticle
+)
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that uses the planner's row estimate for unfiltered changelists
+    on PostgreSQL instead of an exact COUNT(*) over the whole table.
+    """
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql' and not queryset.query.where:
+            with connection.cursor() as cursor:
+                # regclass resolves the name through search_path like the query does
+                cursor.execute(
+                    "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                    [connection.ops.quote_name(queryset.model._meta.db_table)]
+                )
+                row = cursor.fetchone()
+            if row and row[0] >= settings.ADMIN_ESTIMATED_COUNT_THRESHOLD:
+                return int(row[0])
+        return super().count
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Changelist defaults for tables that grow without bound"""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+class SpecializationFilter(admin.SimpleListFilter):
+    """Offers the known edit types instead of a DISTINCT scan over editors"""
+    title = 'specialization'
+    parameter_name = 'specialization'
+    
+    def lookups(self, request, model_admin):
+        return Article.EditType.choices
+    
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(specialization=self.value())
+        return queryset
 
 @admin.register(User)
 class CustomUserAdmin(UserAdmin):
@@ -9,30 +55,38 @@ class CustomUserAdmin(UserAdmin):
     ordering = ('username',)
 
 @admin.register(Editor)
-class EditorAdmin(admin.ModelAdmin):
+class EditorAdmin(LargeTableAdmin):
     list_display = ('user', 'specialization', 'is_active', 'created_at')
-    list_filter = ('is_active', 'specialization')
+    list_select_related = ('user',)
+    autocomplete_fields = ('user',)
+    list_filter = ('is_active', SpecializationFilter)
     search_fields = ('user__username', 'user__email', 'specialization')
     ordering = ('-created_at',)
 
 @admin.register(Article)
-class ArticleAdmin(admin.ModelAdmin):
+class ArticleAdmin(LargeTableAdmin):
     list_display = ('title', 'author', 'editor', 'edit_type', 'status', 'is_approved', 'created_at')
+    list_select_related = ('author', 'editor__user')
+    autocomplete_fields = ('author', 'editor', 'approved_by')
     list_filter = ('status', 'edit_type', 'is_approved')
     search_fields = ('title', 'author__username', 'editor__user__username')
     readonly_fields = ('created_at', 'updated_at', 'approved_at')
     ordering = ('-created_at',)
 
 @admin.register(ArticleAssignment)
-class ArticleAssignmentAdmin(admin.ModelAdmin):
+class ArticleAssignmentAdmin(LargeTableAdmin):
     list_display = ('article', 'editor', 'assigned_at', 'is_active')
+    list_select_related = ('article', 'editor__user')
+    autocomplete_fields = ('article', 'editor')
     list_filter = ('is_active', 'assigned_at')
     search_fields = ('article__title', 'editor__user__username')
     ordering = ('-assigned_at',)
 
 @admin.register(Feedback)
-class FeedbackAdmin(admin.ModelAdmin):
+class FeedbackAdmin(LargeTableAdmin):
     list_display = ('article', 'author', 'rating', 'created_at')
+    list_select_related = ('article', 'author')
+    autocomplete_fields = ('article', 'author')
     list_filter = ('rating', 'created_at')
     search_fields = ('article__title', 'author__username', 'comment')
     ordering = ('-created_at',)
@@ -41,3 +95,17 @@ class FeedbackAdmin(admin.ModelAdmin):
 class StatisticsAdmin(admin.ModelAdmin):
     list_display = ('total_articles', 'active_editors', 'completed_articles', 'last_updated')
     readonly_fields = ('total_articles', 'active_editors', 'completed_articles', 'average_processing_time', 'last_updated')
+
+@admin.register(ArchivedArticle)
+class ArchivedArticleAdmin(LargeTableAdmin):
+    list_display = ('title', 'author', 'editor', 'edit_type', 'status', 'created_at', 'archived_at')
+    list_select_related = ('author', 'editor__user')
+    list_filter = ('status', 'edit_type')
+    search_fields = ('title', 'author__username', 'editor__user__username')
+    ordering = ('-archived_at',)
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,92 @@
+from django.conf import settings
+from django.db import transaction
+from django.http import Http404
+from django.utils import timezone
+from .models import (
+    Article, ArticleAssignment, Feedback,
+    ArchivedArticle, ArchivedArticleAssignment, ArchivedFeedback
+)
+
+FINISHED_STATUSES = (Article.Status.COMPLETED, Article.Status.REJECTED)
+
+ARTICLE_FIELDS = (
+    'id', 'title', 'author_id', 'editor_id', 'original_file', 'edited_file',
+    'edit_type', 'status', 'comments', 'created_at', 'updated_at',
+    'is_approved', 'approved_at', 'approved_by_id'
+)
+ASSIGNMENT_FIELDS = ('id', 'article_id', 'editor_id', 'assigned_at', 'is_active')
+FEEDBACK_FIELDS = ('id', 'article_id', 'author_id', 'rating', 'comment', 'created_at')
+
+
+def _copy(instance, model, fields):
+    return model(**{field: getattr(instance, field) for field in fields})
+
+
+def archivable_articles(older_than=None):
+    """Finished articles whose last update is older than ``older_than``"""
+    if older_than is None:
+        older_than = settings.ARTICLE_ARCHIVE_AFTER
+    cutoff = timezone.now() - older_than
+    return Article.objects.filter(status__in=FINISHED_STATUSES, updated_at__lt=cutoff)
+
+
+def archive_batch(older_than=None, batch_size=None):
+    """
+    Move one batch of finished articles, with their assignments and feedbacks,
+    to the archive tables. Each batch runs in its own transaction so an
+    interrupted run can simply be started again. Returns the number of
+    articles archived.
+    """
+    if batch_size is None:
+        batch_size = settings.ARTICLE_ARCHIVE_BATCH_SIZE
+    
+    with transaction.atomic():
+        ids = list(
+            archivable_articles(older_than)
+            .select_for_update(skip_locked=True)
+            .order_by('pk')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            return 0
+        
+        ArchivedArticle.objects.bulk_create(
+            _copy(article, ArchivedArticle, ARTICLE_FIELDS)
+            for article in Article.objects.filter(pk__in=ids)
+        )
+        ArchivedArticleAssignment.objects.bulk_create(
+            _copy(assignment, ArchivedArticleAssignment, ASSIGNMENT_FIELDS)
+            for assignment in ArticleAssignment.objects.filter(article_id__in=ids)
+        )
+        ArchivedFeedback.objects.bulk_create(
+            _copy(feedback, ArchivedFeedback, FEEDBACK_FIELDS)
+            for feedback in Feedback.objects.filter(article_id__in=ids)
+        )
+        
+        # Files stay where they are; the archived rows reference the same paths
+        ArticleAssignment.objects.filter(article_id__in=ids).delete()
+        Feedback.objects.filter(article_id__in=ids).delete()
+        Article.objects.filter(pk__in=ids).delete()
+    
+    return len(ids)
+
+
+def archived_articles_for(user):
+    """Archived articles visible to ``user``, mirroring ArticleViewSet.get_queryset"""
+    if user.is_staff:
+        return ArchivedArticle.objects.all()
+    elif hasattr(user, 'editor_profile'):
+        return ArchivedArticle.objects.filter(editor=user.editor_profile)
+    return ArchivedArticle.objects.filter(author=user)
+
+
+def get_article_or_archived(pk):
+    """Look an article up in the live table first, then in the archive"""
+    try:
+        return Article.objects.get(pk=pk)
+    except Article.DoesNotExist:
+        pass
+    try:
+        return ArchivedArticle.objects.get(pk=pk)
+    except ArchivedArticle.DoesNotExist:
+        raise Http404('No Article matches the given query.')
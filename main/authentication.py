@@ -0,0 +1,15 @@
+from rest_framework.authentication import BaseAuthentication, TokenAuthentication
+
+
+class BatchAuthentication(BaseAuthentication):
+    """Reuse the user a batch request was authenticated as for its sub-requests"""
+    
+    def authenticate(self, request):
+        user = getattr(request._request, 'batch_user', None)
+        if user is None:
+            return None
+        return (user, request._request.batch_auth)
+    
+    def authenticate_header(self, request):
+        # DRF answers 401 with the first authenticator's challenge; keep Token's
+        return TokenAuthentication().authenticate_header(request)
@@ -0,0 +1,109 @@
+import io
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connections, transaction
+from django.urls import Resolver404, resolve
+from rest_framework.views import APIView
+
+logger = logging.getLogger(__name__)
+
+# Headers of the batch request that must not leak into sub-requests
+BODY_HEADERS = ('CONTENT_TYPE', 'CONTENT_LENGTH', 'HTTP_CONTENT_ENCODING')
+
+
+def build_request(parent, method, path, body=None):
+    """Build a sub-request carrying the parent's headers and identity"""
+    url = urlsplit(path)
+    data = b'' if body is None else json.dumps(body).encode()
+    
+    environ = {key: value for key, value in parent.META.items() if key not in BODY_HEADERS}
+    environ.update({
+        'REQUEST_METHOD': method,
+        'PATH_INFO': url.path,
+        'QUERY_STRING': url.query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(data)),
+        'wsgi.input': io.BytesIO(data),
+    })
+    request = WSGIRequest(environ)
+    request.batch_user = parent.user
+    request.batch_auth = parent.auth
+    return request
+
+
+def execute(parent, operation):
+    """Run one operation and return its status and body"""
+    try:
+        match = resolve(urlsplit(operation['path']).path)
+    except Resolver404:
+        return {'status': 404, 'body': {'error': 'Not found'}}
+    
+    # Only the API views are reachable, and batches cannot nest
+    view_class = getattr(match.func, 'cls', None)
+    if view_class is None or not issubclass(view_class, APIView) or not getattr(view_class, 'batchable', True):
+        return {'status': 400, 'body': {'error': 'Path not allowed in a batch'}}
+    
+    request = build_request(parent, operation['method'], operation['path'], operation.get('body'))
+    try:
+        response = match.func(request, *match.args, **match.kwargs)
+    except Exception:
+        # One failing operation must not cost the client the other responses
+        logger.exception('Batch operation %s %s failed', operation['method'], operation['path'])
+        return {'status': 500, 'body': {'error': 'Internal server error'}}
+    if not hasattr(response, 'data'):
+        # File responses already hold an open file
+        response.close()
+        return {'status': 400, 'body': {'error': 'Response type not supported in a batch'}}
+    return {'status': response.status_code, 'body': response.data}
+
+
+def _execute_in_thread(parent, operation):
+    try:
+        return execute(parent, operation)
+    finally:
+        # Worker threads open their own connections; don't leave them behind
+        connections.close_all()
+
+
+def _execute_reads(parent, operations, executor):
+    if executor is None or len(operations) == 1:
+        return [execute(parent, operation) for operation in operations]
+    return list(executor.map(lambda operation: _execute_in_thread(parent, operation), operations))
+
+
+def execute_batch(parent, operations, atomic=False):
+    """
+    Run ``operations`` in order. Consecutive GETs run concurrently when
+    BATCH_MAX_WORKERS allows it. With ``atomic`` everything runs on this
+    thread in one transaction that is rolled back if any operation fails.
+    """
+    if atomic:
+        with transaction.atomic():
+            results = [execute(parent, operation) for operation in operations]
+            if any(result['status'] >= 400 for result in results):
+                transaction.set_rollback(True)
+        return results
+    
+    executor = None
+    if settings.BATCH_MAX_WORKERS > 1:
+        executor = ThreadPoolExecutor(max_workers=settings.BATCH_MAX_WORKERS)
+    
+    results = []
+    reads = []
+    try:
+        for operation in operations:
+            if operation['method'] == 'GET':
+                reads.append(operation)
+                continue
+            results += _execute_reads(parent, reads, executor)
+            reads = []
+            results.append(execute(parent, operation))
+        results += _execute_reads(parent, reads, executor)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return results
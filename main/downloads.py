@@ -0,0 +1,36 @@
+import time
+from django.conf import settings
+from django.urls import reverse
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+SALT = 'main.downloads.signed-url'
+
+
+def _signature(name, expires):
+    return salted_hmac(SALT, f'{name}:{expires}', algorithm='sha256').hexdigest()
+
+
+def signed_url(name, ttl=None):
+    """
+    Path to the signed download view for storage file ``name``.
+
+    The expiry is rounded up to SIGNED_DOWNLOAD_BUCKET so URLs issued for the
+    same file within one bucket are identical and can be cached downstream.
+    """
+    if ttl is None:
+        ttl = settings.SIGNED_DOWNLOAD_TTL
+    bucket = settings.SIGNED_DOWNLOAD_BUCKET
+    expires = -(-(int(time.time()) + ttl) // bucket) * bucket
+    path = reverse('signed-file-download', kwargs={'name': name})
+    return f'{path}?expires={expires}&signature={_signature(name, expires)}', expires
+
+
+def verify(name, expires, signature):
+    """Check a signed URL without touching the database"""
+    try:
+        expires = int(expires)
+    except (TypeError, ValueError):
+        return False
+    if expires < time.time():
+        return False
+    return constant_time_compare(_signature(name, expires), signature or '')
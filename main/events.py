@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.db.models import Avg, DurationField, ExpressionWrapper, F, OuterRef, Q, Subquery
+from django.utils import timezone
+from .models import Article, ArticleEvent
+
+
+def record_article_event(article, event_type, previous_status=''):
+    """Append an event for ``article`` in its current state"""
+    return ArticleEvent.objects.create(
+        article_id=article.pk,
+        author_id=article.author_id,
+        editor_id=article.editor_id,
+        event_type=event_type,
+        status=article.status,
+        previous_status=previous_status,
+    )
+
+
+def events_for(user):
+    """Events visible to ``user``, mirroring ArticleViewSet.get_queryset"""
+    if user.is_staff:
+        return ArticleEvent.objects.all()
+    elif hasattr(user, 'editor_profile'):
+        return ArticleEvent.objects.filter(
+            Q(editor=user.editor_profile) |
+            Q(status=Article.Status.SUBMITTED)
+        )
+    return ArticleEvent.objects.filter(author=user)
+
+
+def changes_since(user, cursor, limit):
+    """
+    Events after ``cursor`` in id order. Events younger than
+    ARTICLE_CHANGES_SETTLE are held back so that a transaction committing
+    a lower id late cannot be skipped by a client that already moved past it.
+    """
+    settled = timezone.now() - settings.ARTICLE_CHANGES_SETTLE
+    return list(
+        events_for(user)
+        .filter(pk__gt=cursor, created_at__lte=settled)
+        .order_by('pk')[:limit]
+    )
+
+
+def average_processing_time():
+    """Average time between an article's creation and completion events"""
+    created_at = ArticleEvent.objects.filter(
+        article_id=OuterRef('article_id'),
+        event_type=ArticleEvent.EventType.CREATED,
+    ).values('created_at')[:1]
+    
+    return ArticleEvent.objects.filter(
+        event_type=ArticleEvent.EventType.COMPLETED
+    ).annotate(
+        processing_time=ExpressionWrapper(F('created_at') - Subquery(created_at), output_field=DurationField())
+    ).aggregate(
+        average=Avg('processing_time')
+    )['average']
@@ -0,0 +1,31 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from main.archive import archive_batch
+
+
+class Command(BaseCommand):
+    help = 'Move completed and rejected articles older than the configured age to the archive tables'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help='Archive finished articles not updated for this many days '
+                                 '(default: ARTICLE_ARCHIVE_AFTER)')
+        parser.add_argument('--batch-size', type=int, default=settings.ARTICLE_ARCHIVE_BATCH_SIZE,
+                            help='Number of articles moved per transaction')
+        parser.add_argument('--max-batches', type=int, default=None,
+                            help='Stop after this many batches; rerun to resume')
+    
+    def handle(self, *args, **options):
+        older_than = timedelta(days=options['days']) if options['days'] is not None else None
+        total = 0
+        batches = 0
+        while options['max_batches'] is None or batches < options['max_batches']:
+            archived = archive_batch(older_than, options['batch_size'])
+            if not archived:
+                break
+            total += archived
+            batches += 1
+            self.stdout.write(f'Batch {batches}: archived {archived} articles')
+        
+        self.stdout.write(self.style.SUCCESS(f'Archived {total} articles'))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from main.events import average_processing_time
+from main.models import Article, ArchivedArticle, Editor, Statistics
+
+
+class Command(BaseCommand):
+    help = 'Record a new statistics snapshot'
+    
+    def handle(self, *args, **options):
+        # Archived articles still count towards the totals
+        statistics = Statistics.objects.create(
+            total_articles=Article.objects.count() + ArchivedArticle.objects.count(),
+            active_editors=Editor.objects.filter(is_active=True).count(),
+            completed_articles=(
+                Article.objects.filter(status=Article.Status.COMPLETED).count() +
+                ArchivedArticle.objects.filter(status=Article.Status.COMPLETED).count()
+            ),
+            average_processing_time=average_processing_time(),
+        )
+        self.stdout.write(self.style.SUCCESS(f'Recorded {statistics}'))
@@ -0,0 +1,133 @@
+import re
+import zlib
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def _gzip_encoder():
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    return compressor.compress, compressor.flush
+
+
+def _brotli_encoder():
+    compressor = brotli.Compressor(quality=5)
+    return compressor.process, compressor.finish
+
+
+def _zstd_encoder():
+    compressor = zstandard.ZstdCompressor(level=3).compressobj()
+    return compressor.compress, compressor.flush
+
+
+# In order of preference; codecs whose package is missing are left out
+ENCODERS = {}
+if zstandard is not None:
+    ENCODERS['zstd'] = _zstd_encoder
+if brotli is not None:
+    ENCODERS['br'] = _brotli_encoder
+ENCODERS['gzip'] = _gzip_encoder
+
+ACCEPT_ENCODING_RE = re.compile(r'\s*([^\s;,]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?')
+
+
+def parse_accept_encoding(accept_encoding):
+    """Map each encoding in an Accept-Encoding header to its q-value"""
+    accepted = {}
+    for match in ACCEPT_ENCODING_RE.finditer(accept_encoding):
+        try:
+            accepted[match.group(1).lower()] = float(match.group(2) or 1)
+        except ValueError:
+            continue
+    return accepted
+
+
+def accepts_encoding(accept_encoding, encoding):
+    accepted = parse_accept_encoding(accept_encoding)
+    return accepted.get(encoding, accepted.get('*', 0)) > 0
+
+
+def choose_encoding(accept_encoding):
+    """Pick the preferred encoding the client accepts, or None"""
+    accepted = parse_accept_encoding(accept_encoding)
+    qualities = {encoding: accepted.get(encoding, accepted.get('*', 0)) for encoding in ENCODERS}
+    # max() keeps the first of equal values, so ENCODERS order breaks ties
+    encoding = max(qualities, key=qualities.get, default=None)
+    if encoding is None or qualities[encoding] <= 0:
+        return None
+    return encoding
+
+
+def _compress_iterator(chunks, compress, finish):
+    for chunk in chunks:
+        data = compress(chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+async def _compress_async_iterator(chunks, compress, finish):
+    async for chunk in chunks:
+        data = compress(chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compress textual responses with zstd, brotli or gzip depending on the
+    client's Accept-Encoding. Responses below COMPRESSION_MIN_SIZE and
+    responses that already carry a Content-Encoding are left alone.
+    """
+    
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding') or response.status_code == 206:
+            return response
+        
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if not content_type.startswith(settings.COMPRESSION_CONTENT_TYPES):
+            return response
+        
+        # The body depends on Accept-Encoding even when it ends up uncompressed
+        patch_vary_headers(response, ('Accept-Encoding',))
+        
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+        compress, finish = ENCODERS[encoding]()
+        
+        if response.streaming:
+            length = response.get('Content-Length')
+            if length is not None and int(length) < settings.COMPRESSION_MIN_SIZE:
+                return response
+            if response.is_async:
+                response.streaming_content = _compress_async_iterator(response.streaming_content, compress, finish)
+            else:
+                response.streaming_content = _compress_iterator(response.streaming_content, compress, finish)
+            del response['Content-Length']
+        else:
+            if len(response.content) < settings.COMPRESSION_MIN_SIZE:
+                return response
+            compressed = compress(response.content) + finish()
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+        
+        # The compressed body is a different representation
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
@@ -18,6 +18,12 @@ class Editor(models.Model):
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['is_active', 'specialization']),
+            models.Index(fields=['-created_at']),
+        ]
+    
     def clean(self):
         if not self.user.is_staff and not self.user.is_superuser:
             raise ValidationError('Editor must be a staff member or superuser')
@@ -58,6 +64,13 @@ class Article(models.Model):
     approved_at = models.DateTimeField(null=True, blank=True)
     approved_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='approved_articles')
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'updated_at']),
+            models.Index(fields=['edit_type', 'status']),
+            models.Index(fields=['-created_at']),
+        ]
+    
     def clean(self):
         if self.status == self.Status.COMPLETED and not self.edited_file:
             raise ValidationError('Edited file is required for completed articles')
@@ -80,6 +93,10 @@ class ArticleAssignment(models.Model):
     
     class Meta:
         unique_together = ['article', 'editor']
+        indexes = [
+            models.Index(fields=['is_active', 'assigned_at']),
+            models.Index(fields=['-assigned_at']),
+        ]
     
     def __str__(self):
         return f"{self.article.title} - {self.editor.user.get_full_name()}"
@@ -92,9 +109,45 @@ class Feedback(models.Model):
     comment = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['rating', 'created_at']),
+            models.Index(fields=['-created_at']),
+        ]
+    
     def __str__(self):
         return f"Feedback for {self.article.title}"
 
+class ArticleEvent(models.Model):
+    """Append-only log of article changes, used for the change feed"""
+    class EventType(models.TextChoices):
+        CREATED = 'CREATED', _('Created')
+        APPROVED = 'APPROVED', _('Approved')
+        REJECTED = 'REJECTED', _('Rejected')
+        TAKEN = 'TAKEN', _('Taken for Review')
+        COMPLETED = 'COMPLETED', _('Completed')
+        FEEDBACK = 'FEEDBACK', _('Feedback Added')
+        UPDATED = 'UPDATED', _('Updated')
+        DELETED = 'DELETED', _('Deleted')
+    
+    # No database constraint so events outlive archived articles
+    article = models.ForeignKey(Article, on_delete=models.DO_NOTHING, db_constraint=False, related_name='events')
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='article_events')
+    editor = models.ForeignKey(Editor, on_delete=models.SET_NULL, null=True, blank=True, related_name='article_events')
+    event_type = models.CharField(max_length=20, choices=EventType.choices)
+    status = models.CharField(max_length=20, choices=Article.Status.choices)
+    previous_status = models.CharField(max_length=20, choices=Article.Status.choices, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['article', 'event_type']),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_event_type_display()} - {self.article_id}"
+
 class Statistics(models.Model):
     """Statistics model for tracking system usage"""
     total_articles = models.IntegerField(default=0)
@@ -105,3 +158,47 @@ class Statistics(models.Model):
     
     def __str__(self):
         return f"Statistics as of {self.last_updated}"
+
+class ArchivedArticle(models.Model):
+    """Finished article moved out of the live queue, keeping its original id"""
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=255)
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_articles')
+    editor = models.ForeignKey(Editor, on_delete=models.SET_NULL, null=True, blank=True, related_name='archived_articles')
+    original_file = models.FileField(upload_to='articles/original/')
+    edited_file = models.FileField(upload_to='articles/edited/', null=True, blank=True)
+    edit_type = models.CharField(max_length=20, choices=Article.EditType.choices)
+    status = models.CharField(max_length=20, choices=Article.Status.choices)
+    comments = models.TextField(blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    is_approved = models.BooleanField(default=False)
+    approved_at = models.DateTimeField(null=True, blank=True)
+    approved_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='approved_archived_articles')
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return self.title
+
+class ArchivedArticleAssignment(models.Model):
+    """Assignment of an archived article, keeping its original id"""
+    id = models.BigIntegerField(primary_key=True)
+    article = models.ForeignKey(ArchivedArticle, on_delete=models.CASCADE, related_name='assignments')
+    editor = models.ForeignKey(Editor, on_delete=models.CASCADE, related_name='archived_assignments')
+    assigned_at = models.DateTimeField()
+    is_active = models.BooleanField(default=False)
+    
+    def __str__(self):
+        return f"{self.article.title} - {self.editor.user.get_full_name()}"
+
+class ArchivedFeedback(models.Model):
+    """Feedback of an archived article, keeping its original id"""
+    id = models.BigIntegerField(primary_key=True)
+    article = models.ForeignKey(ArchivedArticle, on_delete=models.CASCADE, related_name='feedbacks')
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_feedbacks')
+    rating = models.IntegerField(choices=[(i, i) for i in range(1, 6)])
+    comment = models.TextField()
+    created_at = models.DateTimeField()
+    
+    def __str__(self):
+        return f"Feedback for {self.article.title}"
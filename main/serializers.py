@@ -1,7 +1,11 @@
+from django.conf import settings
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.contrib.auth.hashers import make_password
-from .models import Editor, Article, ArticleAssignment, Feedback, Statistics
+from .models import (
+    Editor, Article, ArticleAssignment, ArticleEvent, Feedback, Statistics,
+    ArchivedArticle, ArchivedArticleAssignment, ArchivedFeedback
+)
 
 User = get_user_model()
 
@@ -88,6 +92,30 @@ class FeedbackSerializer(serializers.ModelSerializer):
         validated_data['author'] = self.context['request'].user
         return super().create(validated_data)
 
+class ArticleEventSerializer(serializers.ModelSerializer):
+    cursor = serializers.IntegerField(source='id', read_only=True)
+    article = serializers.IntegerField(source='article_id', read_only=True)
+    editor = serializers.IntegerField(source='editor_id', read_only=True)
+    
+    class Meta:
+        model = ArticleEvent
+        fields = ('cursor', 'article', 'editor', 'event_type', 'status', 'previous_status', 'created_at')
+        read_only_fields = fields
+
+class BatchOperationSerializer(serializers.Serializer):
+    method = serializers.ChoiceField(choices=['GET', 'POST', 'PUT', 'PATCH', 'DELETE'], default='GET')
+    path = serializers.CharField()
+    body = serializers.JSONField(required=False)
+
+class BatchSerializer(serializers.Serializer):
+    requests = BatchOperationSerializer(many=True, allow_empty=False)
+    atomic = serializers.BooleanField(default=False)
+    
+    def validate_requests(self, value):
+        if len(value) > settings.BATCH_MAX_REQUESTS:
+            raise serializers.ValidationError(f'At most {settings.BATCH_MAX_REQUESTS} requests per batch.')
+        return value
+
 class StatisticsSerializer(serializers.ModelSerializer):
     class Meta:
         model = Statistics
@@ -108,4 +136,40 @@ class EditorDetailSerializer(EditorSerializer):
     assigned_articles = ArticleSerializer(many=True, read_only=True)
     
     class Meta(EditorSerializer.Meta):
-        fields = EditorSerializer.Meta.fields + ('assigned_articles',) 
\ No newline at end of file
+        fields = EditorSerializer.Meta.fields + ('assigned_articles',)
+
+# Archived articles are read-only and rendered exactly like their live counterparts
+class ArchivedArticleSerializer(serializers.ModelSerializer):
+    author = UserSerializer(read_only=True)
+    editor = EditorSerializer(read_only=True)
+    approved_by = UserSerializer(read_only=True)
+    
+    class Meta:
+        model = ArchivedArticle
+        fields = ArticleSerializer.Meta.fields
+        read_only_fields = fields
+
+class ArchivedArticleAssignmentSerializer(serializers.ModelSerializer):
+    article = ArchivedArticleSerializer(read_only=True)
+    editor = EditorSerializer(read_only=True)
+    
+    class Meta:
+        model = ArchivedArticleAssignment
+        fields = ArticleAssignmentSerializer.Meta.fields
+        read_only_fields = fields
+
+class ArchivedFeedbackSerializer(serializers.ModelSerializer):
+    author = UserSerializer(read_only=True)
+    
+    class Meta:
+        model = ArchivedFeedback
+        fields = FeedbackSerializer.Meta.fields
+        read_only_fields = fields
+
+class ArchivedArticleDetailSerializer(ArchivedArticleSerializer):
+    assignments = ArchivedArticleAssignmentSerializer(many=True, read_only=True)
+    feedbacks = ArchivedFeedbackSerializer(many=True, read_only=True)
+    
+    class Meta(ArchivedArticleSerializer.Meta):
+        fields = ArticleDetailSerializer.Meta.fields
+        read_only_fields = fields
@@ -0,0 +1,79 @@
+import gzip
+import os
+import struct
+import zlib
+from django.conf import settings
+from django.core.files.base import File
+from django.core.files.storage import FileSystemStorage
+
+COMPRESSED_SUFFIX = '.gz'
+
+
+def is_compressed(name):
+    return name.endswith(COMPRESSED_SUFFIX)
+
+
+def display_name(name):
+    """File name as uploaded, without the at-rest compression suffix"""
+    name = os.path.basename(name)
+    return name[:-len(COMPRESSED_SUFFIX)] if is_compressed(name) else name
+
+
+class GzipChunks(File):
+    """Gzip an uploaded file chunk by chunk while the storage writes it"""
+    
+    def __init__(self, content):
+        super().__init__(None, content.name)
+        self.content = content
+    
+    def chunks(self, chunk_size=None):
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        for chunk in self.content.chunks(chunk_size):
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
+
+
+class CompressedFileSystemStorage(FileSystemStorage):
+    """
+    Filesystem storage that gzips files with a COMPRESSED_STORAGE_EXTENSIONS
+    extension on write, storing them under a '.gz' name. Opening such a file
+    decompresses it transparently and ``size`` reports the original size;
+    ``open_raw`` gives the gzip bytes for serving with Content-Encoding.
+    """
+    
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if os.path.splitext(name)[1].lower() in settings.COMPRESSED_STORAGE_EXTENSIONS:
+            name += COMPRESSED_SUFFIX
+            content = GzipChunks(content)
+        return super().save(name, content, max_length)
+    
+    def get_alternative_name(self, file_root, file_ext):
+        # Keep 'paper.tex.gz' together as 'paper_<random>.tex.gz'
+        if file_ext == COMPRESSED_SUFFIX:
+            file_root, inner_ext = os.path.splitext(file_root)
+            file_ext = inner_ext + file_ext
+        return super().get_alternative_name(file_root, file_ext)
+    
+    def _open(self, name, mode='rb'):
+        file = super()._open(name, mode)
+        if is_compressed(name) and 'r' in mode:
+            decompressed = File(gzip.GzipFile(fileobj=file.file, mode='rb'), name)
+            # File.size would otherwise report the compressed size on disk
+            decompressed.size = self.size(name)
+            return decompressed
+        return file
+    
+    def open_raw(self, name):
+        return super()._open(name, 'rb')
+    
+    def size(self, name):
+        if not is_compressed(name):
+            return super().size(name)
+        # The gzip trailer ends with the uncompressed size modulo 2**32
+        with open(self.path(name), 'rb') as file:
+            file.seek(-4, os.SEEK_END)
+            return struct.unpack('<I', file.read(4))[0]
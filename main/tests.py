@@ -1,3 +1,802 @@
-from django.test import TestCase
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+from datetime import timedelta
+from unittest import mock
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.http import FileResponse, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from . import downloads, throttling
+from .admin import EstimatedCountPaginator
+from .middleware import CompressionMiddleware, choose_encoding
+from .storage import CompressedFileSystemStorage
+from .archive import archive_batch
+from .events import average_processing_time, record_article_event
+from .zipstream import ZipEntry, archive_size, stream_zip
+from .models import (
+    User, Editor, Article, ArticleAssignment, ArticleEvent, Feedback, Statistics,
+    ArchivedArticle, ArchivedArticleAssignment, ArchivedFeedback
+)
 
-# Create your tests here.
+
+class MediaTestCase(TestCase):
+    """Keeps uploaded files in a temporary MEDIA_ROOT"""
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def create_article(self, author, status=Article.Status.COMPLETED, editor=None, edited=b'edited', age=None):
+        article = Article(
+            title='Article', author=author, editor=editor,
+            edit_type=Article.EditType.GRAMMAR, status=status,
+        )
+        article.original_file.save('original.txt', ContentFile(b'original'), save=False)
+        if edited is not None:
+            article.edited_file.save('edited.txt', ContentFile(edited), save=False)
+        article.save()
+        if age is not None:
+            Article.objects.filter(pk=article.pk).update(updated_at=timezone.now() - age)
+        return article
+
+
+class AdminChangelistQueryTests(TestCase):
+    """Changelist query counts must not grow with the number of rows"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        for i in range(5):
+            editor_user = User.objects.create_user(
+                f'editor{i}', f'editor{i}@example.com', 'password', is_staff=True
+            )
+            editor = Editor.objects.create(user=editor_user, specialization=Article.EditType.GRAMMAR)
+            author = User.objects.create_user(f'author{i}', f'author{i}@example.com', 'password')
+            article = Article(
+                title=f'Article {i}', author=author, editor=editor,
+                edit_type=Article.EditType.GRAMMAR, status=Article.Status.IN_REVIEW,
+                original_file=f'articles/original/article{i}.txt',
+            )
+            article.save()
+            ArticleAssignment.objects.create(article=article, editor=editor)
+            Feedback.objects.create(article=article, author=author, rating=5, comment='Good')
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def assertChangelistQueries(self, model_name, num):
+        url = reverse(f'admin:main_{model_name}_changelist')
+        with self.assertNumQueries(num):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_article_changelist(self):
+        self.assertChangelistQueries('article', 4)
+
+    def test_article_assignment_changelist(self):
+        self.assertChangelistQueries('articleassignment', 4)
+
+    def test_editor_changelist(self):
+        self.assertChangelistQueries('editor', 4)
+
+    def test_feedback_changelist(self):
+        self.assertChangelistQueries('feedback', 4)
+
+    def test_change_form_does_not_load_all_users(self):
+        article = Article.objects.first()
+        url = reverse('admin:main_article_change', args=[article.pk])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'admin-autocomplete')
+        self.assertNotContains(response, 'author4@example.com')
+
+
+@override_settings(ADMIN_ESTIMATED_COUNT_THRESHOLD=100000)
+class EstimatedCountPaginatorTests(TestCase):
+    def setUp(self):
+        User.objects.create_user('author', 'author@example.com', 'password')
+
+    def mock_postgresql(self, estimate):
+        connection = mock.MagicMock(vendor='postgresql')
+        connection.ops.quote_name.side_effect = lambda name: f'"{name}"'
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.fetchone.return_value = (estimate,)
+        patcher = mock.patch('main.admin.connections', {'default': connection})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return cursor
+
+    def test_falls_back_to_exact_count(self):
+        paginator = EstimatedCountPaginator(User.objects.order_by('pk'), 10)
+        self.assertEqual(paginator.count, 1)
+
+    def test_uses_estimate_for_large_postgresql_tables(self):
+        cursor = self.mock_postgresql(250000.0)
+        paginator = EstimatedCountPaginator(User.objects.order_by('pk'), 10)
+        self.assertEqual(paginator.count, 250000)
+        cursor.execute.assert_called_once_with(
+            'SELECT reltuples FROM pg_class WHERE oid = %s::regclass', ['"main_user"']
+        )
+
+    def test_counts_small_postgresql_tables_exactly(self):
+        self.mock_postgresql(-1.0)
+        paginator = EstimatedCountPaginator(User.objects.order_by('pk'), 10)
+        self.assertEqual(paginator.count, 1)
+
+    def test_counts_filtered_changelists_exactly(self):
+        cursor = self.mock_postgresql(250000.0)
+        paginator = EstimatedCountPaginator(User.objects.filter(username='author').order_by('pk'), 10)
+        self.assertEqual(paginator.count, 1)
+        cursor.execute.assert_not_called()
+
+
+class LocalBucketStoreTests(TestCase):
+    def test_bucket_empties_and_refills(self):
+        store = throttling.LocalBucketStore(max_keys=10)
+        for _ in range(3):
+            self.assertIsNone(store.take('reads:1', 3, 1.0, now=100.0))
+        self.assertAlmostEqual(store.take('reads:1', 3, 1.0, now=100.0), 1.0)
+        self.assertIsNone(store.take('reads:1', 3, 1.0, now=101.0))
+
+    def test_least_recently_used_buckets_are_dropped(self):
+        store = throttling.LocalBucketStore(max_keys=2)
+        for key in ('a', 'b', 'c'):
+            store.take(key, 1, 1.0, now=0.0)
+        self.assertEqual(list(store.buckets), ['b', 'c'])
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'throttle': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'throttle-tests'},
+})
+class CacheBucketStoreTests(TestCase):
+    def setUp(self):
+        self.store = throttling.CacheBucketStore('throttle')
+        self.store.cache.clear()
+
+    def test_bucket_empties_and_refills(self):
+        for _ in range(3):
+            self.assertIsNone(self.store.take('reads:1', 3, 1.0, now=100.0))
+        self.assertAlmostEqual(self.store.take('reads:1', 3, 1.0, now=100.0), 1.0)
+        self.assertIsNone(self.store.take('reads:1', 3, 1.0, now=101.0))
+        self.assertIsNone(self.store.cache.get('throttle:reads:1:lock'))
+
+    def test_concurrent_requests_share_one_bucket(self):
+        allowed = []
+
+        def take():
+            if self.store.take('uploads:1', 5, 0.001, now=100.0) is None:
+                allowed.append(True)
+
+        threads = [threading.Thread(target=take) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(allowed), 5)
+
+    def test_request_is_throttled_while_bucket_stays_locked(self):
+        self.store.cache.add('throttle:reads:1:lock', 1)
+        with mock.patch.object(throttling.CacheBucketStore, 'lock_attempts', 2):
+            self.assertIsNotNone(self.store.take('reads:1', 3, 1.0, now=100.0))
+
+
+@override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {'auth': '2/min'}})
+class LoginThrottleTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(throttling, '_store', throttling.LocalBucketStore(max_keys=10))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(throttling.TokenBucketThrottle, 'timer', mock.Mock(return_value=1000.0))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_failed_logins_are_throttled(self):
+        url = reverse('user-login')
+        self.client.post(url, HTTP_AUTHORIZATION='Basic d3Jvbmc6d3Jvbmc=')
+        self.client.post(url, HTTP_AUTHORIZATION='Basic d3Jvbmc6d3Jvbmc=')
+        response = self.client.post(url, HTTP_AUTHORIZATION='Basic d3Jvbmc6d3Jvbmc=')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '30')
+
+    def test_spoofed_forwarded_for_does_not_reset_the_bucket(self):
+        url = reverse('user-login')
+        statuses = [
+            self.client.post(
+                url, HTTP_AUTHORIZATION='Basic d3Jvbmc6d3Jvbmc=', HTTP_X_FORWARDED_FOR=f'10.0.0.{i}'
+            ).status_code
+            for i in range(6)
+        ]
+        self.assertEqual(statuses, [401, 401, 429, 429, 429, 429])
+
+
+class ArchiveTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.author = User.objects.create_user('author', 'author@example.com', 'password')
+        editor_user = User.objects.create_user('editor', 'editor@example.com', 'password', is_staff=True)
+        self.editor = Editor.objects.create(user=editor_user, specialization=Article.EditType.GRAMMAR)
+        self.old = timedelta(days=365)
+
+    def test_only_old_finished_articles_are_archived(self):
+        completed = self.create_article(self.author, age=self.old)
+        rejected = self.create_article(self.author, status=Article.Status.REJECTED, edited=None, age=self.old)
+        recent = self.create_article(self.author)
+        in_review = self.create_article(self.author, status=Article.Status.IN_REVIEW, edited=None, age=self.old)
+
+        self.assertEqual(archive_batch(timedelta(days=180)), 2)
+
+        self.assertQuerySetEqual(
+            ArchivedArticle.objects.order_by('pk').values_list('pk', flat=True),
+            [completed.pk, rejected.pk]
+        )
+        self.assertQuerySetEqual(
+            Article.objects.order_by('pk').values_list('pk', flat=True),
+            [recent.pk, in_review.pk]
+        )
+
+    def test_assignments_and_feedbacks_move_with_their_ids(self):
+        article = self.create_article(self.author, editor=self.editor, age=self.old)
+        assignment = ArticleAssignment.objects.create(article=article, editor=self.editor, is_active=False)
+        feedback = Feedback.objects.create(article=article, author=self.author, rating=4, comment='Thanks')
+
+        archive_batch(timedelta(days=180))
+
+        self.assertFalse(ArticleAssignment.objects.exists())
+        self.assertFalse(Feedback.objects.exists())
+        archived_assignment = ArchivedArticleAssignment.objects.get(pk=assignment.pk)
+        self.assertEqual(archived_assignment.article_id, article.pk)
+        self.assertEqual(archived_assignment.editor, self.editor)
+        archived_feedback = ArchivedFeedback.objects.get(pk=feedback.pk)
+        self.assertEqual(archived_feedback.article_id, article.pk)
+        self.assertEqual(archived_feedback.comment, 'Thanks')
+
+    def test_command_resumes_in_batches(self):
+        articles = [self.create_article(self.author, age=self.old) for _ in range(5)]
+
+        call_command('archive_articles', days=180, batch_size=2, max_batches=1, stdout=mock.Mock())
+        self.assertEqual(ArchivedArticle.objects.count(), 2)
+        self.assertEqual(Article.objects.count(), 3)
+
+        call_command('archive_articles', days=180, batch_size=2, stdout=mock.Mock())
+        self.assertQuerySetEqual(
+            ArchivedArticle.objects.order_by('pk').values_list('pk', flat=True),
+            [article.pk for article in articles]
+        )
+        self.assertFalse(Article.objects.exists())
+
+    def test_archived_article_is_still_served(self):
+        article = self.create_article(self.author, editor=self.editor, age=self.old)
+        Feedback.objects.create(article=article, author=self.author, rating=5, comment='Great')
+        archive_batch(timedelta(days=180))
+
+        client = APIClient()
+        client.force_authenticate(self.author)
+        response = client.get(reverse('article-detail', args=[article.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['id'], article.pk)
+        self.assertEqual(response.data['feedbacks'][0]['comment'], 'Great')
+
+        response = client.get(reverse('article-download', args=[article.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response), b'edited')
+
+    def test_archived_detail_has_the_live_shape(self):
+        article = self.create_article(self.author, editor=self.editor, age=self.old)
+        ArticleAssignment.objects.create(article=article, editor=self.editor, is_active=False)
+        Feedback.objects.create(article=article, author=self.author, rating=5, comment='Great')
+        client = APIClient()
+        client.force_authenticate(self.author)
+        url = reverse('article-detail', args=[article.pk])
+        live = client.get(url).data
+
+        archive_batch(timedelta(days=180))
+        archived = client.get(url).data
+
+        self.assertEqual(archived.keys(), live.keys())
+        self.assertEqual(archived['assignments'][0].keys(), live['assignments'][0].keys())
+        self.assertEqual(archived['assignments'][0]['article'].keys(), live['assignments'][0]['article'].keys())
+        self.assertEqual(archived['feedbacks'][0].keys(), live['feedbacks'][0].keys())
+        self.assertEqual(archived['assignments'][0]['article']['id'], article.pk)
+
+    def test_archived_article_is_hidden_from_other_authors(self):
+        article = self.create_article(self.author, age=self.old)
+        archive_batch(timedelta(days=180))
+
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user('other', 'other@example.com', 'password'))
+        response = client.get(reverse('article-detail', args=[article.pk]))
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(ARTICLE_CHANGES_SETTLE=timedelta(0))
+class ArticleChangesTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.author = User.objects.create_user('author', 'author@example.com', 'password')
+        self.article = self.create_article(self.author, status=Article.Status.PENDING, edited=None)
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+        self.url = reverse('article-detail', args=[self.article.pk])
+
+    def changes(self):
+        response = self.client.get(reverse('article-changes'))
+        self.assertEqual(response.status_code, 200)
+        return response.data['results']
+
+    def test_update_records_an_event(self):
+        response = self.client.patch(self.url, {'title': 'Renamed'}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        events = self.changes()
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]['article'], self.article.pk)
+        self.assertEqual(events[0]['event_type'], ArticleEvent.EventType.UPDATED)
+        self.assertEqual(events[0]['previous_status'], Article.Status.PENDING)
+
+    def test_delete_records_an_event(self):
+        response = self.client.delete(self.url)
+        self.assertEqual(response.status_code, 204)
+
+        events = self.changes()
+        self.assertEqual([event['event_type'] for event in events], [ArticleEvent.EventType.DELETED])
+        self.assertEqual(events[0]['article'], self.article.pk)
+
+    def test_cursor_returns_only_later_changes(self):
+        self.client.patch(self.url, {'title': 'First'}, format='json')
+        cursor = self.changes()[-1]['cursor']
+        self.client.patch(self.url, {'title': 'Second'}, format='json')
+
+        response = self.client.get(reverse('article-changes'), {'since': cursor})
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertFalse(response.data['has_more'])
+
+
+class StatisticsTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.author = User.objects.create_user('author', 'author@example.com', 'password')
+
+    def record(self, article, event_type, at):
+        event = record_article_event(article, event_type)
+        ArticleEvent.objects.filter(pk=event.pk).update(created_at=at)
+
+    def test_average_processing_time_uses_event_timestamps(self):
+        start = timezone.now() - timedelta(days=10)
+        for hours in (2, 4):
+            article = self.create_article(self.author)
+            self.record(article, ArticleEvent.EventType.CREATED, start)
+            self.record(article, ArticleEvent.EventType.COMPLETED, start + timedelta(hours=hours))
+        # Completed without a creation event, e.g. created before the event log existed
+        legacy = self.create_article(self.author)
+        self.record(legacy, ArticleEvent.EventType.COMPLETED, start)
+
+        self.assertEqual(average_processing_time(), timedelta(hours=3))
+
+    def test_average_processing_time_without_events(self):
+        self.assertIsNone(average_processing_time())
+
+    def test_update_statistics_counts_archived_articles(self):
+        for _ in range(6):
+            self.create_article(self.author, age=timedelta(days=365))
+        self.create_article(self.author, status=Article.Status.PENDING, edited=None)
+        archive_batch(timedelta(days=180))
+
+        call_command('update_statistics', stdout=mock.Mock())
+
+        statistics = Statistics.objects.get()
+        self.assertEqual(statistics.total_articles, 7)
+        self.assertEqual(statistics.completed_articles, 6)
+
+
+class SignedDownloadTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.author = User.objects.create_user('author', 'author@example.com', 'password')
+        self.article = self.create_article(self.author)
+        self.name = self.article.edited_file.name
+
+    def signed_url(self, name, expires):
+        path = reverse('signed-file-download', kwargs={'name': name})
+        return f'{path}?expires={expires}&signature={downloads._signature(name, expires)}'
+
+    def test_issued_url_downloads_without_queries(self):
+        client = APIClient()
+        client.force_authenticate(self.author)
+        response = client.get(reverse('article-download-url', args=[self.article.pk]))
+        self.assertEqual(response.status_code, 200)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(response.data['url'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'edited')
+
+    def test_issuing_url_checks_permissions(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user('other', 'other@example.com', 'password'))
+        response = client.get(reverse('article-download-url', args=[self.article.pk]))
+        self.assertEqual(response.status_code, 403)
+
+    def test_expired_url_is_rejected(self):
+        url = self.signed_url(self.name, int(time.time()) - 1)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 403)
+
+    def test_tampered_name_is_rejected(self):
+        url, _ = downloads.signed_url(self.name)
+        url = url.replace(
+            reverse('signed-file-download', kwargs={'name': self.name}),
+            reverse('signed-file-download', kwargs={'name': self.article.original_file.name})
+        )
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+    def test_tampered_signature_is_rejected(self):
+        url, _ = downloads.signed_url(self.name)
+        url = url[:-1] + ('0' if url[-1] != '0' else '1')
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+    def test_missing_signature_is_rejected(self):
+        path = reverse('signed-file-download', kwargs={'name': self.name})
+        with self.assertNumQueries(0):
+            response = self.client.get(f'{path}?expires={int(time.time()) + 60}')
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(SIGNED_DOWNLOAD_ACCEL_PREFIX='/protected/')
+    def test_accel_redirect_quotes_the_name(self):
+        name = 'articles/edited/my paper é.txt'
+        response = self.client.get(self.signed_url(name, int(time.time()) + 60))
+        self.assertEqual(response['X-Accel-Redirect'], '/protected/articles/edited/my%20paper%20%C3%A9.txt')
+        self.assertEqual(
+            response['Content-Disposition'],
+            "attachment; filename*=utf-8''my%20paper%20%C3%A9.txt"
+        )
+
+
+class ZipStreamTests(TestCase):
+    def entry(self, name, data):
+        return ZipEntry(name, len(data), lambda: io.BytesIO(data), timezone.now())
+
+    def test_stream_is_a_valid_zip_of_the_announced_size(self):
+        files = {'1-paper.txt': b'paper ' * 10000, '2-é.tex': b'', '3-notes.md': b'notes'}
+        entries = [self.entry(name, data) for name, data in files.items()]
+
+        data = b''.join(stream_zip(entries, chunk_size=1000))
+
+        self.assertEqual(archive_size(entries), len(data))
+        archive = zipfile.ZipFile(io.BytesIO(data))
+        self.assertIsNone(archive.testzip())
+        self.assertEqual({name: archive.read(name) for name in archive.namelist()}, files)
+
+    def test_archives_needing_zip64_have_no_size(self):
+        self.assertIsNone(archive_size([ZipEntry('big.bin', 2 ** 32, None, timezone.now())]))
+
+
+class BulkDownloadTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.author = User.objects.create_user('author', 'author@example.com', 'password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def download(self, query):
+        return self.client.get(f"{reverse('article-bulk-download')}?{query}")
+
+    def test_downloads_my_completed_articles(self):
+        articles = [self.create_article(self.author) for _ in range(2)]
+        self.create_article(self.author, status=Article.Status.IN_REVIEW, edited=None)
+
+        response = self.download('scope=my')
+
+        self.assertEqual(response.status_code, 200)
+        data = b''.join(response.streaming_content)
+        self.assertEqual(int(response['Content-Length']), len(data))
+        archive = zipfile.ZipFile(io.BytesIO(data))
+        self.assertEqual(
+            sorted(archive.namelist()),
+            sorted(f'{article.pk}-{article.edited_file.name.split("/")[-1]}' for article in articles)
+        )
+
+    @override_settings(BULK_DOWNLOAD_MAX_ARTICLES=3)
+    def test_too_many_ids_are_refused_before_querying(self):
+        ids = ','.join(str(self.create_article(self.author).pk) for _ in range(6))
+        with self.assertNumQueries(0):
+            response = self.download(f'ids={ids}')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {'error': 'Too many articles'})
+
+    def test_unknown_id_is_not_found(self):
+        article = self.create_article(self.author)
+        response = self.download(f'ids={article.pk},{article.pk + 100}')
+        self.assertEqual(response.status_code, 404)
+
+    def test_other_authors_articles_are_refused(self):
+        other = User.objects.create_user('other', 'other@example.com', 'password')
+        article = self.create_article(other)
+        response = self.download(f'ids={article.pk}')
+        self.assertEqual(response.status_code, 403)
+
+
+class BatchTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.author = User.objects.create_user('author', 'author@example.com', 'password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def batch(self, requests, atomic=False):
+        response = self.client.post(reverse('batch'), {'requests': requests, 'atomic': atomic}, format='json')
+        self.assertEqual(response.status_code, 200)
+        return response.data['responses']
+
+    @override_settings(BATCH_MAX_WORKERS=1)
+    def test_responses_come_back_in_order(self):
+        article = self.create_article(self.author, status=Article.Status.PENDING, edited=None)
+        responses = self.batch([
+            {'path': '/api/profile/'},
+            {'method': 'PUT', 'path': '/api/profile/', 'body': {'first_name': 'Ada'}},
+            {'path': '/api/articles/my/'},
+            {'path': '/api/profile/?fields=all'},
+        ])
+        self.assertEqual([response['status'] for response in responses], [200, 200, 200, 200])
+        self.assertEqual(responses[0]['body']['first_name'], '')
+        self.assertEqual(responses[1]['body']['first_name'], 'Ada')
+        self.assertEqual(responses[2]['body'][0]['id'], article.pk)
+        self.assertEqual(responses[3]['body']['first_name'], 'Ada')
+
+    @override_settings(BATCH_MAX_WORKERS=1)
+    def test_sub_requests_run_as_the_batch_user(self):
+        responses = self.batch([
+            {'path': '/api/profile/'},
+            {'path': '/api/statistics/'},
+        ])
+        self.assertEqual(responses[0]['body']['username'], 'author')
+        self.assertEqual(responses[1]['status'], 403)
+
+    def test_batch_requires_authentication(self):
+        response = APIClient().post(reverse('batch'), {'requests': [{'path': '/api/profile/'}]}, format='json')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response['WWW-Authenticate'], 'Token')
+
+    def test_unauthenticated_api_calls_are_challenged_for_a_token(self):
+        for url in (reverse('user-profile'), reverse('article-list')):
+            response = APIClient().get(url)
+            self.assertEqual(response.status_code, 401)
+            self.assertEqual(response['WWW-Authenticate'], 'Token')
+
+    def test_atomic_batch_rolls_back_on_failure(self):
+        responses = self.batch([
+            {'method': 'PUT', 'path': '/api/profile/', 'body': {'first_name': 'Ada'}},
+            {'path': '/api/statistics/'},
+        ], atomic=True)
+        self.assertEqual(responses[0]['status'], 200)
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.first_name, '')
+
+    def test_atomic_batch_commits_on_success(self):
+        self.batch([{'method': 'PUT', 'path': '/api/profile/', 'body': {'first_name': 'Ada'}}], atomic=True)
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.first_name, 'Ada')
+
+    def test_nested_batch_and_non_api_paths_are_refused(self):
+        responses = self.batch([
+            {'method': 'POST', 'path': '/api/batch/', 'body': {'requests': []}},
+            {'path': '/admin/'},
+            {'path': '/api/files/articles/edited/edited.txt'},
+            {'path': '/api/missing/'},
+        ])
+        self.assertEqual([response['status'] for response in responses], [400, 400, 400, 404])
+
+    def failing_submit(self):
+        editor_user = User.objects.create_user('editor', 'editor@example.com', 'password', is_staff=True)
+        editor = Editor.objects.create(user=editor_user, specialization=Article.EditType.GRAMMAR)
+        article = self.create_article(self.author, status=Article.Status.IN_REVIEW, editor=editor, edited=None)
+        ArticleAssignment.objects.create(article=article, editor=editor)
+        self.client.force_authenticate(editor_user)
+        self.editor_user = editor_user
+        # Submitting without a file fails Article.full_clean with a Django ValidationError
+        return {'method': 'POST', 'path': f'/api/editor/articles/{article.pk}/submit/', 'body': {}}
+
+    @override_settings(BATCH_MAX_WORKERS=1)
+    def test_failing_operation_does_not_fail_the_batch(self):
+        submit = self.failing_submit()
+        with self.assertLogs('main.batch', 'ERROR'):
+            responses = self.batch([
+                {'method': 'PUT', 'path': '/api/profile/', 'body': {'first_name': 'Ada'}},
+                submit,
+                {'path': '/api/profile/'},
+            ])
+        self.assertEqual([response['status'] for response in responses], [200, 500, 200])
+        self.editor_user.refresh_from_db()
+        self.assertEqual(self.editor_user.first_name, 'Ada')
+
+    def test_failing_operation_rolls_back_atomic_batch(self):
+        submit = self.failing_submit()
+        with self.assertLogs('main.batch', 'ERROR'):
+            responses = self.batch([
+                {'method': 'PUT', 'path': '/api/profile/', 'body': {'first_name': 'Ada'}},
+                submit,
+            ], atomic=True)
+        self.assertEqual([response['status'] for response in responses], [200, 500])
+        self.editor_user.refresh_from_db()
+        self.assertEqual(self.editor_user.first_name, '')
+
+    def test_file_responses_are_refused_and_closed(self):
+        article = self.create_article(self.author)
+        with mock.patch.object(FileResponse, 'close', autospec=True, side_effect=FileResponse.close) as close:
+            responses = self.batch([{'path': f'/api/articles/{article.pk}/download/'}])
+        self.assertEqual(responses[0]['status'], 400)
+        close.assert_called_once()
+
+
+@override_settings(BATCH_MAX_WORKERS=4)
+class ConcurrentBatchTests(TransactionTestCase):
+    def test_concurrent_reads_keep_their_order(self):
+        author = User.objects.create_user('author', 'author@example.com', 'password')
+        client = APIClient()
+        client.force_authenticate(author)
+        paths = ['/api/profile/', '/api/articles/my/', '/api/editor/articles/available/', '/api/profile/']
+        response = client.post(reverse('batch'), {'requests': [{'path': path} for path in paths]}, format='json')
+        statuses = [sub_response['status'] for sub_response in response.data['responses']]
+        self.assertEqual(statuses, [200, 200, 403, 200])
+        self.assertEqual(response.data['responses'][3]['body']['username'], 'author')
+
+
+@override_settings(COMPRESSION_MIN_SIZE=200)
+class CompressionMiddlewareTests(TestCase):
+    payload = [{'id': i, 'title': 'A rather long article title'} for i in range(50)]
+
+    def process(self, response, accept_encoding='gzip'):
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING=accept_encoding)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_negotiation(self):
+        self.assertEqual(choose_encoding('gzip, deflate'), 'gzip')
+        self.assertEqual(choose_encoding('deflate, gzip;q=0.5'), 'gzip')
+        self.assertIsNone(choose_encoding('gzip;q=0'))
+        self.assertIsNone(choose_encoding('identity'))
+        self.assertIsNone(choose_encoding(''))
+        self.assertIsNotNone(choose_encoding('*'))
+        self.assertIsNone(choose_encoding('*, gzip;q=0, br;q=0, zstd;q=0'))
+
+    def test_negotiation_prefers_higher_quality(self):
+        encoders = {'zstd': None, 'br': None, 'gzip': None}
+        with mock.patch('main.middleware.ENCODERS', encoders):
+            self.assertEqual(choose_encoding('gzip;q=1, br;q=0.1'), 'gzip')
+            self.assertEqual(choose_encoding('gzip, br;q=0.9, zstd;q=0.5'), 'gzip')
+            self.assertEqual(choose_encoding('gzip, br'), 'br')
+            self.assertEqual(choose_encoding('*'), 'zstd')
+            self.assertEqual(choose_encoding('*;q=0.5, br'), 'br')
+            self.assertEqual(choose_encoding('zstd;q=0, br;q=0.2, gzip;q=0.2'), 'br')
+            self.assertIsNone(choose_encoding('zstd;q=0, br;q=0, gzip;q=0'))
+
+    def test_large_json_is_compressed(self):
+        response = self.process(JsonResponse(self.payload, safe=False))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+        self.assertEqual(json.loads(gzip.decompress(response.content)), self.payload)
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_refused_encoding_is_not_used(self):
+        response = self.process(JsonResponse(self.payload, safe=False), 'gzip;q=0')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_small_responses_are_not_compressed(self):
+        response = self.process(JsonResponse({'id': 1}))
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(json.loads(response.content), {'id': 1})
+
+    def test_binary_and_encoded_responses_are_left_alone(self):
+        response = self.process(HttpResponse(b'x' * 1000, content_type='application/zip'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+        response = HttpResponse(b'x' * 1000, content_type='text/plain')
+        response['Content-Encoding'] = 'br'
+        self.assertEqual(self.process(response).content, b'x' * 1000)
+
+    def test_streaming_responses_are_compressed_on_the_fly(self):
+        chunks = [f'line {i}\n'.encode() for i in range(500)]
+        response = StreamingHttpResponse(iter(chunks), content_type='text/plain')
+        response['Content-Length'] = sum(len(chunk) for chunk in chunks)
+        response = self.process(response)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertFalse(response.has_header('Content-Length'))
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), b''.join(chunks))
+
+    def test_etag_becomes_weak(self):
+        response = JsonResponse(self.payload, safe=False)
+        response['ETag'] = '"abc"'
+        self.assertEqual(self.process(response)['ETag'], 'W/"abc"')
+
+
+@override_settings(COMPRESSED_STORAGE_EXTENSIONS=('.tex',))
+class CompressedStorageTests(TestCase):
+    content = b'\\section{Introduction} ' * 1000
+
+    def setUp(self):
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location, ignore_errors=True)
+        self.storage = CompressedFileSystemStorage(location=location)
+
+    def test_compressible_files_round_trip(self):
+        name = self.storage.save('articles/paper.tex', ContentFile(self.content))
+
+        self.assertEqual(name, 'articles/paper.tex.gz')
+        self.assertLess(os.path.getsize(self.storage.path(name)), len(self.content))
+        with self.storage.open_raw(name) as file:
+            self.assertEqual(gzip.decompress(file.read()), self.content)
+        with self.storage.open(name) as file:
+            self.assertEqual(file.size, len(self.content))
+            self.assertEqual(file.read(), self.content)
+        self.assertEqual(self.storage.size(name), len(self.content))
+
+    def test_alternative_names_keep_the_compressed_suffix(self):
+        self.storage.save('paper.tex', ContentFile(self.content))
+        name = self.storage.save('paper.tex', ContentFile(self.content))
+        self.assertRegex(name, r'^paper_\w+\.tex\.gz$')
+
+    def test_other_files_are_stored_as_they_are(self):
+        name = self.storage.save('paper.docx', ContentFile(b'docx'))
+        self.assertEqual(name, 'paper.docx')
+        with self.storage.open(name) as file:
+            self.assertEqual(file.read(), b'docx')
+
+
+@override_settings(
+    STORAGES={
+        'default': {'BACKEND': 'main.storage.CompressedFileSystemStorage'},
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    },
+    COMPRESSED_STORAGE_EXTENSIONS=('.txt',),
+)
+class CompressedDownloadTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.author = User.objects.create_user('author', 'author@example.com', 'password')
+        self.article = self.create_article(self.author, edited=b'edited text')
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+        self.url = reverse('article-download', args=[self.article.pk])
+
+    def test_gzip_clients_get_the_stored_bytes(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/plain')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), b'edited text')
+
+    def test_other_clients_get_decompressed_bytes(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='identity')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response['Content-Type'], 'text/plain')
+        self.assertEqual(response['Content-Length'], str(len(b'edited text')))
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="edited.txt"')
+        self.assertEqual(b''.join(response.streaming_content), b'edited text')
+
+    def test_decompressed_file_is_closed_with_the_response(self):
+        opened = []
+        storage_open = CompressedFileSystemStorage.open
+
+        def tracking_open(storage, name, mode='rb'):
+            opened.append(storage_open(storage, name, mode))
+            return opened[-1]
+
+        with mock.patch.object(CompressedFileSystemStorage, 'open', tracking_open):
+            response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='identity')
+        self.assertFalse(opened[0].closed)
+        response.close()
+        self.assertTrue(opened[0].closed)
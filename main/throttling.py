@@ -0,0 +1,123 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+DURATIONS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+@lru_cache(maxsize=None)
+def parse_rate(rate):
+    """Turn a DRF style rate such as '100/min' into (capacity, tokens per second)"""
+    num, period = rate.split('/')
+    num = int(num)
+    return num, num / DURATIONS[period[0]]
+
+
+class LocalBucketStore:
+    """
+    In-process bucket store. Each bucket is a (tokens, timestamp) tuple and
+    the least recently used buckets are dropped past THROTTLE_LOCAL_MAX_KEYS.
+    """
+    
+    def __init__(self, max_keys):
+        self.max_keys = max_keys
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+    
+    def take(self, key, capacity, rate, now):
+        with self.lock:
+            tokens, updated = self.buckets.pop(key, (capacity, now))
+            tokens, wait = _refill_and_take(tokens, updated, capacity, rate, now)
+            self.buckets[key] = (tokens, now)
+            if len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+        return wait
+
+
+class CacheBucketStore:
+    """
+    Bucket store in a Django cache, shared by all workers. Each update holds
+    a per-bucket lock taken with the cache's atomic ``add``; a request that
+    cannot get the lock within ``lock_attempts`` tries is throttled.
+    """
+    lock_timeout = 1
+    lock_attempts = 50
+    lock_delay = 0.001
+    
+    def __init__(self, alias):
+        self.cache = caches[alias]
+    
+    def take(self, key, capacity, rate, now):
+        key = f'throttle:{key}'
+        lock_key = f'{key}:lock'
+        for _ in range(self.lock_attempts):
+            if self.cache.add(lock_key, 1, timeout=self.lock_timeout):
+                break
+            time.sleep(self.lock_delay)
+        else:
+            return self.lock_attempts * self.lock_delay
+        
+        try:
+            tokens, updated = self.cache.get(key, (capacity, now))
+            tokens, wait = _refill_and_take(tokens, updated, capacity, rate, now)
+            # A bucket left alone until it refills is the same as a missing one
+            self.cache.set(key, (tokens, now), timeout=int(capacity / rate) + 1)
+        finally:
+            self.cache.delete(lock_key)
+        return wait
+
+
+def _refill_and_take(tokens, updated, capacity, rate, now):
+    """Return the new token count and the wait in seconds (None if allowed)"""
+    tokens = min(capacity, tokens + (now - updated) * rate)
+    if tokens >= 1:
+        return tokens - 1, None
+    return tokens, (1 - tokens) / rate
+
+
+_store = None
+
+
+def get_store():
+    global _store
+    if _store is None:
+        if settings.THROTTLE_BUCKET_STORE == 'cache':
+            _store = CacheBucketStore(settings.THROTTLE_CACHE_ALIAS)
+        else:
+            _store = LocalBucketStore(settings.THROTTLE_LOCAL_MAX_KEYS)
+    return _store
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Token bucket per user (or client IP for anonymous requests and views with
+    ``throttle_by_address``) and per ``throttle_scope`` of the view. Rates come
+    from DEFAULT_THROTTLE_RATES and views without a scope fall back to 'reads'.
+    """
+    default_scope = 'reads'
+    timer = time.time
+    
+    def allow_request(self, request, view):
+        scope = getattr(view, 'throttle_scope', None) or self.default_scope
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+        if rate is None:
+            return True
+        
+        if getattr(view, 'throttle_by_address', False):
+            ident = self.get_ident(request)
+        elif request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        
+        capacity, refill = parse_rate(rate)
+        self.wait_time = get_store().take(f'{scope}:{ident}', capacity, refill, self.timer())
+        return self.wait_time is None
+    
+    def wait(self):
+        return self.wait_time
@@ -17,9 +17,16 @@ urlpatterns = [
     # User profile
     path('profile/', views.UserProfileView.as_view(), name='user-profile'),
     
+    # Several API calls in one request
+    path('batch/', views.BatchView.as_view(), name='batch'),
+    
     # Author endpoints
     path('articles/my/', views.AuthorArticleListView.as_view(), name='author-articles'),
+    path('articles/download/', views.ArticleBulkDownloadView.as_view(), name='article-bulk-download'),
+    path('articles/changes/', views.ArticleChangesView.as_view(), name='article-changes'),
     path('articles/<int:pk>/download/', views.ArticleDownloadView.as_view(), name='article-download'),
+    path('articles/<int:pk>/download-url/', views.ArticleDownloadUrlView.as_view(), name='article-download-url'),
+    path('files/<path:name>', views.signed_file_download, name='signed-file-download'),
     
     # Editor endpoints
     path('editor/articles/available/', views.EditorAvailableArticlesView.as_view(), name='editor-available-articles'),
@@ -1,6 +1,14 @@
 from django.shortcuts import render, get_object_or_404
 from django.contrib.auth import get_user_model, authenticate
-from django.http import HttpResponse
+import mimetypes
+import time
+from urllib.parse import quote
+from django.core.files.storage import default_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import HttpResponse, Http404, FileResponse, StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.http import content_disposition_header
+from django.views.decorators.http import require_GET
 from django.utils import timezone
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action, api_view, permission_classes
@@ -9,13 +17,23 @@ from rest_framework.views import APIView
 from rest_framework.authtoken.models import Token
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.authentication import SessionAuthentication, BasicAuthentication 
+from django.db import transaction
 from django.db.models import Q
-from .models import Editor, Article, ArticleAssignment, Feedback, Statistics
+from django.conf import settings
+from .models import ArchivedArticle, Editor, Article, ArticleAssignment, ArticleEvent, Feedback, Statistics
 from .serializers import (
     UserSerializer, EditorSerializer, ArticleSerializer, 
     ArticleDetailSerializer, ArticleAssignmentSerializer, 
-    FeedbackSerializer, StatisticsSerializer, EditorDetailSerializer
+    FeedbackSerializer, StatisticsSerializer, EditorDetailSerializer,
+    ArchivedArticleDetailSerializer, ArticleEventSerializer, BatchSerializer
 )
+from .archive import archived_articles_for, get_article_or_archived
+from .events import record_article_event, changes_since
+from . import downloads
+from .batch import execute_batch
+from .zipstream import ZipEntry, archive_size, stream_zip
+from .middleware import accepts_encoding
+from .storage import display_name, is_compressed
 from rest_framework import serializers
 
 User = get_user_model()
@@ -23,6 +41,8 @@ User = get_user_model()
 # Authentication Views
 class UserRegistrationView(APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_scope = 'auth'
+    throttle_by_address = True
     
     def post(self, request):
         serializer = UserSerializer(data=request.data)
@@ -37,6 +57,17 @@ class UserRegistrationView(APIView):
 
 class UserLoginView(APIView):
     authentication_classes = [BasicAuthentication]
+    throttle_scope = 'auth'
+    throttle_by_address = True
+    
+    def perform_authentication(self, request):
+        # Failed logins count too, so throttle before checking the credentials
+        super().check_throttles(request)
+        super().perform_authentication(request)
+    
+    def check_throttles(self, request):
+        # Already done in perform_authentication
+        pass
     
     def post(self, request):
         user = request.user        
@@ -74,11 +105,31 @@ class UserProfileView(APIView):
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+class BatchView(APIView):
+    permission_classes = [IsAuthenticated]
+    batchable = False
+    
+    def post(self, request):
+        serializer = BatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        results = execute_batch(
+            request,
+            serializer.validated_data['requests'],
+            atomic=serializer.validated_data['atomic'],
+        )
+        return Response({'responses': results})
+
 # Article Viewsets
 class ArticleViewSet(viewsets.ModelViewSet):
     serializer_class = ArticleSerializer
     permission_classes = [IsAuthenticated]
     
+    @property
+    def throttle_scope(self):
+        return 'uploads' if self.action in ('create', 'update', 'partial_update') else 'reads'
+    
     def get_queryset(self):
         user = self.request.user
         if user.is_staff:
@@ -96,8 +147,30 @@ class ArticleViewSet(viewsets.ModelViewSet):
             return ArticleDetailSerializer
         return ArticleSerializer
     
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            return super().retrieve(request, *args, **kwargs)
+        except Http404:
+            # Finished articles may have been moved to the archive tables
+            article = get_object_or_404(archived_articles_for(request.user), pk=kwargs['pk'])
+            serializer = ArchivedArticleDetailSerializer(article, context=self.get_serializer_context())
+            return Response(serializer.data)
+    
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user)
+        with transaction.atomic():
+            article = serializer.save(author=self.request.user)
+            record_article_event(article, ArticleEvent.EventType.CREATED)
+    
+    def perform_update(self, serializer):
+        previous_status = serializer.instance.status
+        with transaction.atomic():
+            article = serializer.save()
+            record_article_event(article, ArticleEvent.EventType.UPDATED, previous_status)
+    
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            record_article_event(instance, ArticleEvent.EventType.DELETED, instance.status)
+            instance.delete()
 
 # Editor Viewsets
 class EditorViewSet(viewsets.ModelViewSet):
@@ -128,7 +201,9 @@ class FeedbackViewSet(viewsets.ModelViewSet):
         
         try:
             article = Article.objects.get(id=article_id)
-            serializer.save(author=self.request.user, article=article)
+            with transaction.atomic():
+                serializer.save(author=self.request.user, article=article)
+                record_article_event(article, ArticleEvent.EventType.FEEDBACK)
         except Article.DoesNotExist:
             raise serializers.ValidationError({'article': 'Article not found.'})
 
@@ -147,28 +222,194 @@ class AuthorArticleListView(APIView):
         serializer = ArticleSerializer(articles, many=True)
         return Response(serializer.data)
 
+class ArticleChangesView(APIView):
+    permission_classes = [IsAuthenticated]
+    throttle_scope = 'queue'
+    
+    def get(self, request):
+        try:
+            since = int(request.query_params.get('since', 0))
+            limit = int(request.query_params.get('limit', settings.ARTICLE_CHANGES_LIMIT))
+        except ValueError:
+            return Response({"error": "Invalid cursor"}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, settings.ARTICLE_CHANGES_LIMIT))
+        
+        # Fetch one extra row to know whether the client should keep paging
+        events = changes_since(request.user, since, limit + 1)
+        has_more = len(events) > limit
+        events = events[:limit]
+        
+        return Response({
+            'cursor': events[-1].pk if events else since,
+            'has_more': has_more,
+            'results': ArticleEventSerializer(events, many=True).data,
+        })
+
+DOWNLOAD_FIELDS = {'original': 'original_file', 'edited': 'edited_file'}
+
+class FileChunks:
+    """Iterate a file in chunks; the response closes the file via ``close``"""
+    
+    def __init__(self, file):
+        self.file = file
+    
+    def __iter__(self):
+        return self.file.chunks()
+    
+    def close(self):
+        self.file.close()
+
+def stored_file_response(request, storage, name):
+    """
+    Attachment response for a stored file. Files kept gzipped at rest are
+    sent as they are, with Content-Encoding, to clients that accept gzip.
+    """
+    filename = display_name(name)
+    if not is_compressed(name) or not hasattr(storage, 'open_raw'):
+        return FileResponse(storage.open(name, 'rb'), as_attachment=True, filename=filename)
+    
+    if accepts_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''), 'gzip'):
+        response = FileResponse(storage.open_raw(name), as_attachment=True, filename=filename)
+        response['Content-Encoding'] = 'gzip'
+    else:
+        # Same type FileResponse guesses for the gzip branch
+        content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        response = StreamingHttpResponse(FileChunks(storage.open(name, 'rb')), content_type=content_type)
+        response['Content-Length'] = storage.size(name)
+        response['Content-Disposition'] = content_disposition_header(True, filename)
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+def download_error(user, article, field='edited_file'):
+    """Error response if ``user`` may not download ``field`` of ``article``, else None"""
+    # Check if user is author or editor
+    if article.author_id != user.pk and not hasattr(user, 'editor_profile'):
+        return Response({"error": "Not authorized"}, status=status.HTTP_403_FORBIDDEN)
+    
+    # Edited files are only handed out once the article is completed
+    if field == 'edited_file' and article.status != Article.Status.COMPLETED:
+        return Response({"error": "Article not ready for download"}, status=status.HTTP_400_BAD_REQUEST)
+    
+    if not getattr(article, field):
+        return Response({"error": "File not available"}, status=status.HTTP_404_NOT_FOUND)
+    return None
+
 class ArticleDownloadView(APIView):
     permission_classes = [IsAuthenticated]
     
     def get(self, request, pk):
-        article = get_object_or_404(Article, pk=pk)
+        article = get_article_or_archived(pk)
         
-        # Check if user is author or editor
-        if article.author != request.user and not hasattr(request.user, 'editor_profile'):
-            return Response({"error": "Not authorized"}, status=status.HTTP_403_FORBIDDEN)
-        
-        # Check if article is completed
-        if article.status != Article.Status.COMPLETED:
-            return Response({"error": "Article not ready for download"}, status=status.HTTP_400_BAD_REQUEST)
+        error = download_error(request.user, article)
+        if error:
+            return error
         
         # Return the file
-        response = HttpResponse(article.edited_file, content_type='application/octet-stream')
-        response['Content-Disposition'] = f'attachment; filename="{article.edited_file.name}"'
+        return stored_file_response(request, article.edited_file.storage, article.edited_file.name)
+
+class ArticleDownloadUrlView(APIView):
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, pk):
+        field = DOWNLOAD_FIELDS.get(request.query_params.get('file', 'edited'))
+        if field is None:
+            return Response({"error": "Invalid file"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        article = get_article_or_archived(pk)
+        error = download_error(request.user, article, field)
+        if error:
+            return error
+        
+        url, expires = downloads.signed_url(getattr(article, field).name)
+        return Response({'url': request.build_absolute_uri(url), 'expires': expires})
+
+class ArticleBulkDownloadView(APIView):
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        ids = request.query_params.get('ids')
+        if ids:
+            try:
+                ids = {int(pk) for pk in ids.split(',')}
+            except ValueError:
+                return Response({"error": "Invalid ids"}, status=status.HTTP_400_BAD_REQUEST)
+            if len(ids) > settings.BULK_DOWNLOAD_MAX_ARTICLES:
+                return Response({"error": "Too many articles"}, status=status.HTTP_400_BAD_REQUEST)
+            filters = {'pk__in': ids}
+        elif request.query_params.get('scope') == 'my':
+            filters = {'author': request.user, 'status': Article.Status.COMPLETED}
+        else:
+            return Response({"error": "Pass ids or scope=my"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Archived articles are downloadable like live ones
+        limit = settings.BULK_DOWNLOAD_MAX_ARTICLES + 1
+        articles = (
+            list(Article.objects.filter(**filters).order_by('pk')[:limit]) +
+            list(ArchivedArticle.objects.filter(**filters).order_by('pk')[:limit])
+        )
+        if len(articles) > settings.BULK_DOWNLOAD_MAX_ARTICLES:
+            return Response({"error": "Too many articles"}, status=status.HTTP_400_BAD_REQUEST)
+        if ids and len(articles) != len(ids):
+            return Response({"error": "Article not found"}, status=status.HTTP_404_NOT_FOUND)
+        
+        entries = []
+        for article in articles:
+            error = download_error(request.user, article)
+            if error:
+                error.data['article'] = article.pk
+                return error
+            
+            edited_file = article.edited_file
+            entries.append(ZipEntry(
+                f'{article.pk}-{display_name(edited_file.name)}',
+                edited_file.size,
+                lambda name=edited_file.name, storage=edited_file.storage: storage.open(name, 'rb'),
+                article.updated_at,
+            ))
+        
+        size = archive_size(entries)
+        if size is None:
+            return Response({"error": "Archive too large"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        response = StreamingHttpResponse(stream_zip(entries), content_type='application/zip')
+        response['Content-Length'] = size
+        response['Content-Disposition'] = 'attachment; filename="articles.zip"'
         return response
 
+@require_GET
+def signed_file_download(request, name):
+    """
+    Serve a file from a signed URL. Only the signature is checked, so neither
+    the database nor the authentication stack is involved.
+    """
+    expires = request.GET.get('expires')
+    if not downloads.verify(name, expires, request.GET.get('signature')):
+        return HttpResponse(status=status.HTTP_403_FORBIDDEN)
+    
+    accel_prefix = settings.SIGNED_DOWNLOAD_ACCEL_PREFIX
+    accepts_gzip = accepts_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''), 'gzip')
+    if accel_prefix and (not is_compressed(name) or accepts_gzip):
+        # Let the web server stream the bytes from its internal location
+        response = HttpResponse(content_type='application/octet-stream')
+        response['X-Accel-Redirect'] = accel_prefix + quote(name)
+        response['Content-Disposition'] = content_disposition_header(True, display_name(name))
+        if is_compressed(name):
+            response['Content-Encoding'] = 'gzip'
+    else:
+        try:
+            response = stored_file_response(request, default_storage, name)
+        except (FileNotFoundError, SuspiciousFileOperation):
+            raise Http404
+    
+    # The URL itself is the credential, so shared caches may keep the
+    # response until the URL expires
+    response['Cache-Control'] = f'public, max-age={max(int(expires) - int(time.time()), 0)}'
+    return response
+
 # Editor-specific Views
 class EditorAvailableArticlesView(APIView):
     permission_classes = [IsAuthenticated]
+    throttle_scope = 'queue'
     
     def get(self, request):
         if not hasattr(request.user, 'editor_profile'):
@@ -205,18 +446,21 @@ class EditorTakeArticleView(APIView):
         if article.edit_type != editor.specialization:
             return Response({"error": "Specialization mismatch"}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Create assignment
-        ArticleAssignment.objects.create(article=article, editor=editor)
-        
-        # Update article status
-        article.status = Article.Status.IN_REVIEW
-        article.editor = editor
-        article.save()
+        with transaction.atomic():
+            # Create assignment
+            ArticleAssignment.objects.create(article=article, editor=editor)
+            
+            # Update article status
+            article.status = Article.Status.IN_REVIEW
+            article.editor = editor
+            article.save()
+            record_article_event(article, ArticleEvent.EventType.TAKEN, Article.Status.SUBMITTED)
         
         return Response({"message": "Article taken successfully"})
 
 class EditorSubmitArticleView(APIView):
     permission_classes = [IsAuthenticated]
+    throttle_scope = 'uploads'
     
     def post(self, request, pk):
         if not hasattr(request.user, 'editor_profile'):
@@ -229,21 +473,24 @@ class EditorSubmitArticleView(APIView):
         if article.editor != editor or article.status != Article.Status.IN_REVIEW:
             return Response({"error": "Not authorized"}, status=status.HTTP_403_FORBIDDEN)
         
-        # Update article
-        article.edited_file = request.FILES.get('edited_file')
-        article.comments = request.data.get('comments', '')
-        article.status = Article.Status.COMPLETED
-        article.save()
-        
-        # Update assignment
-        assignment = ArticleAssignment.objects.get(article=article, editor=editor)
-        assignment.is_active = False
-        assignment.save()
+        with transaction.atomic():
+            # Update article
+            article.edited_file = request.FILES.get('edited_file')
+            article.comments = request.data.get('comments', '')
+            article.status = Article.Status.COMPLETED
+            article.save()
+            
+            # Update assignment
+            assignment = ArticleAssignment.objects.get(article=article, editor=editor)
+            assignment.is_active = False
+            assignment.save()
+            record_article_event(article, ArticleEvent.EventType.COMPLETED, Article.Status.IN_REVIEW)
         
         return Response({"message": "Article submitted successfully"})
 
 class EditorAssignedArticlesView(APIView):
     permission_classes = [IsAuthenticated]
+    throttle_scope = 'queue'
     
     def get(self, request):
         if not hasattr(request.user, 'editor_profile'):
@@ -276,11 +523,13 @@ class AdminApproveArticleView(APIView):
         if article.status != Article.Status.PENDING:
             return Response({"error": "Article not pending"}, status=status.HTTP_400_BAD_REQUEST)
         
-        article.is_approved = True
-        article.approved_at = timezone.now()
-        article.approved_by = request.user
-        article.status = Article.Status.SUBMITTED
-        article.save()
+        with transaction.atomic():
+            article.is_approved = True
+            article.approved_at = timezone.now()
+            article.approved_by = request.user
+            article.status = Article.Status.SUBMITTED
+            article.save()
+            record_article_event(article, ArticleEvent.EventType.APPROVED, Article.Status.PENDING)
         
         return Response({"message": "Article approved successfully"})
 
@@ -293,8 +542,10 @@ class AdminRejectArticleView(APIView):
         if article.status != Article.Status.PENDING:
             return Response({"error": "Article not pending"}, status=status.HTTP_400_BAD_REQUEST)
         
-        article.status = Article.Status.REJECTED
-        article.comments = request.data.get('reason', '')
-        article.save()
+        with transaction.atomic():
+            article.status = Article.Status.REJECTED
+            article.comments = request.data.get('reason', '')
+            article.save()
+            record_article_event(article, ArticleEvent.EventType.REJECTED, Article.Status.PENDING)
         
         return Response({"message": "Article rejected successfully"})
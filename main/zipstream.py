@@ -0,0 +1,93 @@
+"""
+Minimal streaming ZIP writer.
+
+Entries are stored uncompressed, so the size of the archive is known before
+any file is read and can be sent as Content-Length. CRCs are computed while
+streaming and written in data descriptors after each file.
+"""
+import struct
+import zlib
+
+LOCAL_HEADER = struct.Struct('<IHHHHHIIIHH')
+DATA_DESCRIPTOR = struct.Struct('<IIII')
+CENTRAL_HEADER = struct.Struct('<IHHHHHHIIIHHHHHII')
+END_OF_CENTRAL_DIRECTORY = struct.Struct('<IHHHHIIH')
+
+# Data descriptor follows the data, names are UTF-8
+FLAGS = 0x0008 | 0x0800
+VERSION = 20
+MAX_SIZE = 0xFFFFFFFF
+MAX_ENTRIES = 0xFFFF
+
+
+class ZipEntry:
+    """A file to be added to the archive"""
+    
+    def __init__(self, name, size, opener, modified):
+        self.name = name.encode('utf-8')
+        self.size = size
+        self.open = opener
+        self.modified = modified
+
+
+def _dos_datetime(value):
+    year = max(value.year, 1980)
+    return (
+        (value.hour << 11) | (value.minute << 5) | (value.second // 2),
+        ((year - 1980) << 9) | (value.month << 5) | value.day,
+    )
+
+
+def archive_size(entries):
+    """Exact size of the archive, or None if it would need ZIP64"""
+    if len(entries) > MAX_ENTRIES:
+        return None
+    size = END_OF_CENTRAL_DIRECTORY.size
+    for entry in entries:
+        if entry.size > MAX_SIZE:
+            return None
+        size += LOCAL_HEADER.size + len(entry.name) + entry.size + DATA_DESCRIPTOR.size
+        size += CENTRAL_HEADER.size + len(entry.name)
+    return size if size <= MAX_SIZE else None
+
+
+def stream_zip(entries, chunk_size=64 * 1024):
+    """Yield the archive in chunks, reading one entry at a time"""
+    offset = 0
+    central_directory = []
+    
+    for entry in entries:
+        dos_time, dos_date = _dos_datetime(entry.modified)
+        header = LOCAL_HEADER.pack(
+            0x04034b50, VERSION, FLAGS, 0, dos_time, dos_date,
+            0, 0, 0, len(entry.name), 0
+        ) + entry.name
+        yield header
+        
+        crc = 0
+        size = 0
+        with entry.open() as file:
+            while True:
+                chunk = file.read(chunk_size)
+                if not chunk:
+                    break
+                crc = zlib.crc32(chunk, crc)
+                size += len(chunk)
+                yield chunk
+        if size != entry.size:
+            raise ValueError(f'{entry.name!r} changed size while streaming')
+        
+        yield DATA_DESCRIPTOR.pack(0x08074b50, crc, size, size)
+        
+        central_directory.append(CENTRAL_HEADER.pack(
+            0x02014b50, VERSION, VERSION, FLAGS, 0, dos_time, dos_date,
+            crc, size, size, len(entry.name), 0, 0, 0, 0, 0, offset
+        ) + entry.name)
+        offset += len(header) + size + DATA_DESCRIPTOR.size
+    
+    directory = b''.join(central_directory)
+    yield directory
+    yield END_OF_CENTRAL_DIRECTORY.pack(
+        0x06054b50, 0, 0, len(central_directory), len(central_directory),
+        len(directory), offset, 0
+    )